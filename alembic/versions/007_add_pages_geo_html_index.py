@@ -0,0 +1,38 @@
+"""Add partial index on pages with geo_html
+
+Revision ID: 007_add_pages_geo_html_index
+Revises: 006_add_worker_fields
+Create Date: 2025-11-22 00:00:00.000000
+
+Adds a partial index on pages.client_id covering only rows that have
+geo_html, so per-client lookups of published pages (e.g. the KV batch
+upload) skip pages that are still being processed.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007_add_pages_geo_html_index'
+down_revision: Union[str, None] = '006_add_worker_fields'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create partial index on pages.client_id where geo_html is set."""
+
+    op.create_index(
+        'ix_pages_client_id_with_geo_html',
+        'pages',
+        ['client_id'],
+        postgresql_where=sa.text('geo_html IS NOT NULL'),
+        sqlite_where=sa.text('geo_html IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Drop partial index on pages.client_id."""
+
+    op.drop_index('ix_pages_client_id_with_geo_html', 'pages')
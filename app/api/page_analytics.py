@@ -8,7 +8,7 @@ IMPORTANT: When modifying endpoints in this file, update postman_collection.json
 """
 from uuid import UUID
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 
 from app.middleware.auth import require_api_key
 from app.models.base import SessionLocal
@@ -27,7 +27,9 @@ def get_client_analytics(client_id: UUID):
         client_id: Client UUID
 
     Returns:
-        JSON object with page analytics
+        JSON object with page analytics. The response carries an ETag;
+        sending it back in If-None-Match returns 304 Not Modified until
+        the analytics record changes.
 
     Example:
         GET /api/v1/pages_analytics/client/{client_id}
@@ -62,7 +64,18 @@ def get_client_analytics(client_id: UUID):
                 'message': 'Use POST /api/v1/pages_analytics/calculate/{client_id} to generate analytics first'
             }), 404
 
-        return jsonify(analytics.to_dict()), 200
+        # updated_at moves on every write to the record, recalculation included
+        etag = f'{analytics.id}:{analytics.updated_at.isoformat()}'
+
+        # If-None-Match uses weak comparison, so a W/ prefix added by a proxy
+        # or compression layer still matches
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = jsonify(analytics.to_dict())
+        response.set_etag(etag)
+
+        return response
     except Exception as e:
         return jsonify({'error': f'Failed to get analytics: {str(e)}'}), 500
     finally:
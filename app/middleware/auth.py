@@ -4,6 +4,7 @@ Authentication middleware.
 Provides simple API key authentication via X-API-Key header.
 For production, consider using more robust authentication (OAuth2, JWT, etc.).
 """
+import re
 from functools import wraps
 from typing import Callable, Optional, Tuple
 
@@ -12,6 +13,36 @@ from flask import request, jsonify
 from app.config import settings
 
 
+# Known AI bots, checked in this order
+AI_BOT_SIGNATURES = {
+    'gptbot': 'GPTBot',
+    'chatgpt': 'ChatGPT',
+    'claudebot': 'ClaudeBot',
+    'claude-web': 'Claude',
+    'anthropic-ai': 'Anthropic',
+    'google-extended': 'Google-Extended',
+    'bingbot': 'BingBot',
+    'bingpreview': 'BingPreview',
+    'slurp': 'Yahoo',
+    'duckduckbot': 'DuckDuckBot',
+    'baiduspider': 'BaiduSpider',
+    'yandexbot': 'YandexBot',
+    'facebookexternalhit': 'FacebookBot',
+    'twitterbot': 'TwitterBot',
+    'linkedinbot': 'LinkedInBot',
+    'slackbot': 'SlackBot',
+    'discordbot': 'DiscordBot',
+    'telegrambot': 'TelegramBot',
+    'whatsapp': 'WhatsApp',
+    'applebot': 'AppleBot',
+    'amazonbot': 'AmazonBot',
+    'petalbot': 'PetalBot',
+}
+
+# One pass over the user agent rules out every signature at once
+_AI_BOT_SIGNATURE_RE = re.compile('|'.join(map(re.escape, AI_BOT_SIGNATURES)))
+
+
 def require_api_key(f: Callable) -> Callable:
     """
     Decorator to require API key authentication.
@@ -87,33 +118,11 @@ def detect_bot(user_agent: str) -> Tuple[bool, Optional[str]]:
 
     user_agent_lower = user_agent.lower()
 
-    # Known AI bots
-    ai_bots = {
-        'gptbot': 'GPTBot',
-        'chatgpt': 'ChatGPT',
-        'claudebot': 'ClaudeBot',
-        'claude-web': 'Claude',
-        'anthropic-ai': 'Anthropic',
-        'google-extended': 'Google-Extended',
-        'bingbot': 'BingBot',
-        'bingpreview': 'BingPreview',
-        'slurp': 'Yahoo',
-        'duckduckbot': 'DuckDuckBot',
-        'baiduspider': 'BaiduSpider',
-        'yandexbot': 'YandexBot',
-        'facebookexternalhit': 'FacebookBot',
-        'twitterbot': 'TwitterBot',
-        'linkedinbot': 'LinkedInBot',
-        'slackbot': 'SlackBot',
-        'discordbot': 'DiscordBot',
-        'telegrambot': 'TelegramBot',
-        'whatsapp': 'WhatsApp',
-        'applebot': 'AppleBot',
-        'amazonbot': 'AmazonBot',
-        'petalbot': 'PetalBot',
-    }
-
-    for bot_signature, bot_name in ai_bots.items():
+    # Most traffic is human, so bail out after a single scan
+    if not _AI_BOT_SIGNATURE_RE.search(user_agent_lower):
+        return False, None
+
+    for bot_signature, bot_name in AI_BOT_SIGNATURES.items():
         if bot_signature in user_agent_lower:
             return True, bot_name
 
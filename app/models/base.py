@@ -1,6 +1,7 @@
 """Base model and database setup."""
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
 from app.config import settings
 
 # SQLAlchemy base class
@@ -22,9 +23,13 @@ def init_db(database_url: str) -> None:
 
     # SQLite doesn't support pool_size and max_overflow parameters
     if database_url.startswith('sqlite'):
+        # An in-memory database only lives as long as its connection, so
+        # share a single one across threads instead of one per thread.
+        in_memory = database_url in ('sqlite://', 'sqlite:///:memory:')
         engine = create_engine(
             database_url,
             connect_args={'check_same_thread': False},
+            poolclass=StaticPool if in_memory else None,
             echo=settings.is_development,
         )
     else:
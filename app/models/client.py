@@ -10,7 +10,7 @@ from typing import Optional
 from uuid import uuid4
 
 from sqlalchemy import (
-    Boolean, Column, DateTime, ForeignKey, Integer, Float,
+    Boolean, Column, DateTime, ForeignKey, Index, Integer, Float,
     LargeBinary, String, Text, UniqueConstraint, text, TypeDecorator, func
 )
 from sqlalchemy.dialects.postgresql import UUID as PostgreSQLUUID
@@ -178,6 +178,13 @@ class Page(Base):
     __tablename__ = "pages"
     __table_args__ = (
         UniqueConstraint("client_id", "url", name="uq_client_url"),
+        # Partial index for per-client lookups of published pages (geo_html generated)
+        Index(
+            "ix_pages_client_id_with_geo_html",
+            "client_id",
+            postgresql_where=text("geo_html IS NOT NULL"),
+            sqlite_where=text("geo_html IS NOT NULL"),
+        ),
     )
 
     id = Column(GUID, primary_key=True, default=uuid4)
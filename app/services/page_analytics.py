@@ -8,12 +8,18 @@ from datetime import datetime, timedelta
 from typing import Optional, List
 from uuid import UUID
 
-from sqlalchemy import func
+from sqlalchemy import and_, case, func
 from sqlalchemy.orm import Session
 
 from app.models.client import Page, PageAnalytics, Client
 
 
+def _count_non_empty(column):
+    """COUNT of rows where column is neither NULL nor an empty string."""
+    # COUNT skips the NULLs produced by the CASE for non-matching rows
+    return func.count(case((and_(column.isnot(None), column != ''), 1)))
+
+
 class PageAnalyticsService:
     """Service for calculating and managing page analytics."""
 
@@ -37,38 +43,27 @@ class PageAnalyticsService:
         if not client:
             raise ValueError(f"Client with id {client_id} not found")
 
-        # Calculate total URLs
-        total_urls = db.query(func.count(Page.id)).filter(
+        # Calculate every page count in a single aggregate query
+        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+        counts = db.query(
+            func.count(Page.id),
+            _count_non_empty(Page.raw_markdown),
+            _count_non_empty(Page.llm_markdown),
+            _count_non_empty(Page.geo_html),
+            _count_non_empty(Page.kv_key),
+            func.count(case((Page.updated_at >= thirty_days_ago, 1))),
+        ).filter(
             Page.client_id == client_id
-        ).scalar() or 0
-
-        # Calculate URLs with raw markdown
-        urls_with_raw_markdown = db.query(func.count(Page.id)).filter(
-            Page.client_id == client_id,
-            Page.raw_markdown.isnot(None),
-            Page.raw_markdown != ''
-        ).scalar() or 0
-
-        # Calculate URLs with LLM markdown
-        urls_with_markdown = db.query(func.count(Page.id)).filter(
-            Page.client_id == client_id,
-            Page.llm_markdown.isnot(None),
-            Page.llm_markdown != ''
-        ).scalar() or 0
-
-        # Calculate URLs with geo HTML
-        urls_with_geo_html = db.query(func.count(Page.id)).filter(
-            Page.client_id == client_id,
-            Page.geo_html.isnot(None),
-            Page.geo_html != ''
-        ).scalar() or 0
-
-        # Calculate URLs with KV key
-        urls_with_kv_key = db.query(func.count(Page.id)).filter(
-            Page.client_id == client_id,
-            Page.kv_key.isnot(None),
-            Page.kv_key != ''
-        ).scalar() or 0
+        ).one()
+
+        (
+            total_urls,
+            urls_with_raw_markdown,
+            urls_with_markdown,
+            urls_with_geo_html,
+            urls_with_kv_key,
+            pages_updated_last_30_days,
+        ) = (count or 0 for count in counts)
 
         # Calculate completion rates
         html_completion_rate = (urls_with_raw_markdown / total_urls * 100) if total_urls > 0 else 0.0
@@ -76,13 +71,6 @@ class PageAnalyticsService:
         geo_html_completion_rate = (urls_with_geo_html / total_urls * 100) if total_urls > 0 else 0.0
         kv_upload_completion_rate = (urls_with_kv_key / total_urls * 100) if total_urls > 0 else 0.0
 
-        # Calculate pages updated in last 30 days
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        pages_updated_last_30_days = db.query(func.count(Page.id)).filter(
-            Page.client_id == client_id,
-            Page.updated_at >= thirty_days_ago
-        ).scalar() or 0
-
         # Check if analytics record exists
         analytics = db.query(PageAnalytics).filter(
             PageAnalytics.client_id == client_id
@@ -83,6 +83,138 @@ def db(_db):
     connection.close()
 
 
+def _savepoint_session(engine):
+    """
+    Yield a session whose commits stay inside one outer transaction.
+
+    ``commit()`` and ``rollback()`` on the session only release or roll back
+    a SAVEPOINT, so everything written through it - committed or not - is
+    discarded when the outer transaction is rolled back on teardown.
+
+    Args:
+        engine: Engine to connect to
+
+    Yields:
+        Database session
+    """
+    connection = engine.connect()
+    transaction = connection.begin()
+    # pysqlite defers BEGIN until the first DML statement, which would make
+    # the first RELEASE SAVEPOINT a real commit. Open the transaction now.
+    connection.exec_driver_sql('BEGIN')
+
+    session = sessionmaker(bind=connection, join_transaction_mode='create_savepoint')()
+
+    yield session
+
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture(scope='function')
+def function_db(_db):
+    """
+    Provide a savepoint session for a single test.
+
+    Unlike ``db``, the test may call ``commit()`` freely; its rows are still
+    rolled back when it finishes.
+
+    Yields:
+        Database session
+    """
+    yield from _savepoint_session(_db)
+
+
+@pytest.fixture(scope='class')
+def class_db(_db):
+    """
+    Provide a savepoint session shared by every test in a class.
+
+    Rows created by class-scoped fixtures are inserted once and rolled back
+    when the class finishes. Use ``savepoint_db`` so each test's own writes
+    don't leak into the next test.
+
+    Yields:
+        Database session
+    """
+    yield from _savepoint_session(_db)
+
+
+@pytest.fixture(scope='module')
+def module_db(_db):
+    """
+    Provide a savepoint session shared by every test in a module.
+
+    Like ``class_db``, but for fixtures shared across several test classes.
+    Rows are inserted once per module and rolled back when it finishes.
+
+    Yields:
+        Database session
+    """
+    yield from _savepoint_session(_db)
+
+
+@pytest.fixture(scope='module')
+def shared_db(module_db):
+    """
+    Provide the shared session that ``savepoint_db`` nests inside.
+
+    Defaults to ``module_db``; a test class can override it with a
+    class-scoped fixture returning ``class_db``.
+
+    Returns:
+        Database session
+    """
+    return module_db
+
+
+@pytest.fixture(scope='function')
+def savepoint_db(shared_db):
+    """
+    Run a test inside a savepoint on the shared session.
+
+    Rows from module- or class-scoped fixtures stay visible, and whatever
+    the test writes is rolled back when it finishes. pytest sets up those
+    wider-scoped fixtures before this one, so their rows are inserted on
+    the shared session outside the savepoint and survive its rollback.
+
+    Yields:
+        Database session
+    """
+    savepoint = shared_db.begin_nested()
+
+    yield shared_db
+
+    savepoint.rollback()
+
+
+@pytest.fixture(scope='function')
+def app_db(function_db):
+    """
+    Provide a savepoint session that the API's own sessions join.
+
+    Routes open and close their own ``SessionLocal`` sessions. On the shared
+    in-memory connection that close rolls back whatever the test inserted,
+    so a second request would no longer see the fixture rows. Bound to this
+    test's connection, route sessions work inside a SAVEPOINT instead, and
+    everything is still rolled back when the test finishes.
+
+    Yields:
+        Database session
+    """
+    from app.models import base
+
+    base.SessionLocal.configure(
+        bind=function_db.connection(),
+        join_transaction_mode='create_savepoint'
+    )
+
+    yield function_db
+
+    base.SessionLocal.configure(bind=base.engine, join_transaction_mode='conditional_savepoint')
+
+
 @pytest.fixture(scope='function')
 def client(app):
     """
@@ -108,30 +240,51 @@ def auth_headers():
     return {'X-API-Key': 'test-master-api-key'}
 
 
+@pytest.fixture(scope='session')
+def _sample_client_data(app):
+    """
+    Build the sample client's column values once per test session.
+
+    The secrets are Fernet-encrypted here, so tests that only need a
+    client row don't pay for encryption on every insert.
+
+    Args:
+        app: Flask app fixture
+
+    Returns:
+        Dictionary of Client column values
+    """
+    template = Client()
+    template.cloudflare_api_token = 'test-cloudflare-token'
+    template.gemini_api_key = 'test-gemini-key'
+
+    return {
+        'name': 'Test Corp',
+        'domain': 'test.com',
+        'cloudflare_account_id': 'test-account-id',
+        'cloudflare_kv_namespace_id': 'test-kv-namespace',
+        'cloudflare_api_token_encrypted': template.cloudflare_api_token_encrypted,
+        'gemini_api_key_encrypted': template.gemini_api_key_encrypted,
+        'is_active': True,
+    }
+
+
 @pytest.fixture(scope='function')
-def sample_client(db):
+def sample_client(db, _sample_client_data):
     """
     Create a sample client for testing.
 
     Args:
         db: Database session fixture
+        _sample_client_data: Pre-built column values
 
     Returns:
         Sample Client instance
     """
-    client = Client(
-        name='Test Corp',
-        domain='test.com',
-        cloudflare_account_id='test-account-id',
-        cloudflare_kv_namespace_id='test-kv-namespace',
-        is_active=True
-    )
-    client.cloudflare_api_token = 'test-cloudflare-token'
-    client.gemini_api_key = 'test-gemini-key'
+    client = Client(**_sample_client_data)
 
     db.add(client)
-    db.commit()
-    db.refresh(client)
+    db.flush()
 
     return client
 
@@ -161,8 +314,7 @@ def sample_page(db, sample_client):
     page.update_content_hash()
 
     db.add(page)
-    db.commit()
-    db.refresh(page)
+    db.flush()
 
     return page
 
@@ -191,8 +343,7 @@ def sample_visit(db, sample_client, sample_page):
     )
 
     db.add(visit)
-    db.commit()
-    db.refresh(visit)
+    db.flush()
 
     return visit
 
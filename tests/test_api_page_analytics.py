@@ -8,6 +8,12 @@ from datetime import datetime, timedelta
 from app.models.client import Page, PageAnalytics
 
 
+@pytest.fixture(scope='function')
+def db(app_db):
+    """Share one rolled-back transaction between fixtures and API requests."""
+    return app_db
+
+
 @pytest.fixture(scope='function')
 def pages_with_pipeline_stages(db, sample_client):
     """
@@ -161,6 +167,48 @@ class TestGetClientAnalytics:
         assert 'last_calculated_at' in data
         assert 'created_at' in data
         assert 'updated_at' in data
+        assert response.headers['ETag']
+
+    def test_get_analytics_not_modified(self, client, auth_headers, sample_client, sample_analytics):
+        """Test conditional GET returns 304 while analytics are unchanged."""
+        url = f'/api/v1/pages_analytics/client/{sample_client.id}'
+        etag = client.get(url, headers=auth_headers).headers['ETag']
+
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert response.data == b''
+
+    def test_get_analytics_not_modified_weak_etag(self, client, auth_headers, sample_client, sample_analytics):
+        """Test a weakened ETag (e.g. from a compressing proxy) still matches."""
+        url = f'/api/v1/pages_analytics/client/{sample_client.id}'
+        etag = client.get(url, headers=auth_headers).headers['ETag']
+
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': f'W/{etag}'})
+
+        assert response.status_code == 304
+
+    def test_get_analytics_etag_changes_after_recalculation(self, client, auth_headers, sample_client, sample_analytics):
+        """Test recalculating analytics invalidates the previous ETag."""
+        url = f'/api/v1/pages_analytics/client/{sample_client.id}'
+        etag = client.get(url, headers=auth_headers).headers['ETag']
+
+        client.post(f'/api/v1/pages_analytics/calculate/{sample_client.id}', headers=auth_headers)
+        response = client.get(url, headers={**auth_headers, 'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+    def test_get_analytics_stale_etag(self, client, auth_headers, sample_client, sample_analytics):
+        """Test conditional GET with an old ETag returns the full analytics."""
+        response = client.get(
+            f'/api/v1/pages_analytics/client/{sample_client.id}',
+            headers={**auth_headers, 'If-None-Match': '"stale"'}
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()['total_urls'] == 100
 
 
 class TestCalculateClientAnalytics:
@@ -3,85 +3,108 @@ Tests for llms.txt generation service.
 
 Tests generating llms.txt format from pages, caching, and spec compliance.
 """
+import re
+
 import pytest
 from datetime import datetime
 
 from app.models.client import Client, Page
-from tests.fixtures.test_data import (
-    MOCK_CLIENT_DATA,
-    MOCK_SITEMAP_URLS,
-    MOCK_GEMINI_GEO_HTML,
-    MOCK_GEMINI_LLM_MARKDOWN,
-    MOCK_LLMS_TXT,
-)
+from tests.fixtures.test_data import MOCK_GEMINI_GEO_HTML, MOCK_LLMS_TXT
 
+# MOCK_LLMS_TXT is static: split it and check for the pages section once
+_MOCK_LINES = MOCK_LLMS_TXT.split('\n')
+_HAS_PAGES_SECTION = '## Pages' in MOCK_LLMS_TXT
 
-@pytest.fixture
-def llms_client(db):
-    """Create a client for llms.txt testing."""
+# Line patterns, matched against the whole document in one pass
+_BLOCKQUOTE_RE = re.compile(r'^>', re.MULTILINE)
+_URL_LINE_RE = re.compile(r'^[ \t]*- .*https://.*$', re.MULTILINE)
+_DESCRIPTION_RE = re.compile(r'^  [^-]', re.MULTILINE)
+
+
+def _url_lines_well_formed(text):
+    """Check there are URL lines and all of them use the '- Title: https://...' form."""
+    url_lines = _URL_LINE_RE.findall(text)
+    return len(url_lines) > 0 and all(': https://' in l for l in url_lines)
+
+
+def _make_page(client, path, **kwargs):
+    """Build a Page for ``client`` at ``path`` with its url_hash filled in."""
+    url = f'https://{client.domain}{path}'
+    return Page(
+        client_id=client.id,
+        url=url,
+        url_hash=Page.compute_url_hash(url),
+        **kwargs
+    )
+
+
+def _make_llms_client(session):
+    """Insert the llms.txt test client through ``session`` and return it."""
     client = Client(
         name="LLMS Test Shop",
         domain="llms-test.com",
         is_active=True
     )
 
-    db.add(client)
-    db.commit()
-    db.refresh(client)
+    session.add(client)
+    session.flush()
 
     return client
 
 
+@pytest.fixture
+def llms_client(db):
+    """Create a client for llms.txt testing."""
+    return _make_llms_client(db)
+
+
 @pytest.fixture
 def pages_for_llms_txt(db, llms_client):
     """Create pages with geo_html for llms.txt generation."""
     pages_data = [
         {
-            'url': f'https://{llms_client.domain}/',
+            'path': '/',
             'title': 'Homepage',
             'description': 'Welcome to our shop'
         },
         {
-            'url': f'https://{llms_client.domain}/products/shirt',
+            'path': '/products/shirt',
             'title': 'Premium Cotton T-Shirt',
             'description': 'High-quality organic cotton t-shirt. $29.99'
         },
         {
-            'url': f'https://{llms_client.domain}/products/pants',
+            'path': '/products/pants',
             'title': 'Organic Cotton Pants',
             'description': 'Comfortable cotton pants. $49.99'
         },
         {
-            'url': f'https://{llms_client.domain}/pages/about',
+            'path': '/pages/about',
             'title': 'About Us',
             'description': 'Learn about our mission'
         },
         {
-            'url': f'https://{llms_client.domain}/pages/contact',
+            'path': '/pages/contact',
             'title': 'Contact',
             'description': 'Get in touch with us'
         },
     ]
 
+    now = datetime.utcnow()
     pages = []
     for data in pages_data:
-        page = Page(
-            client_id=llms_client.id,
-            url=data['url'],
-            url_hash=Page.compute_url_hash(data['url']),
+        page = _make_page(
+            llms_client,
+            data['path'],
             raw_markdown=f"# {data['title']}\n\n{data['description']}",
             llm_markdown=f"# {data['title']}\n\n{data['description']}",
             geo_html=f"<html><head><title>{data['title']}</title></head><body><h1>{data['title']}</h1><p>{data['description']}</p></body></html>",
-            last_processed_at=datetime.utcnow()
+            last_processed_at=now
         )
         db.add(page)
         pages.append(page)
 
     db.commit()
 
-    for page in pages:
-        db.refresh(page)
-
     return pages
 
 
@@ -114,21 +137,18 @@ class TestLLMSTxtService:
     def test_llms_txt_format_compliance(self):
         """Test llms.txt follows official spec."""
         # Based on https://llmstxt.org/
-        lines = MOCK_LLMS_TXT.split('\n')
 
         # Should start with # (site name)
-        assert lines[0].startswith('#')
+        assert MOCK_LLMS_TXT.startswith('#')
 
         # Should have > (description)
-        description_lines = [l for l in lines if l.startswith('>')]
-        assert len(description_lines) > 0
+        assert _BLOCKQUOTE_RE.search(MOCK_LLMS_TXT)
 
         # Should have ## Pages section
-        assert '## Pages' in MOCK_LLMS_TXT
+        assert _HAS_PAGES_SECTION
 
         # URLs should be prefixed with -
-        url_lines = [l for l in lines if l.strip().startswith('- ') and 'https://' in l]
-        assert len(url_lines) > 0
+        assert _URL_LINE_RE.search(MOCK_LLMS_TXT)
 
     def test_llms_txt_metadata_extraction(self, pages_for_llms_txt):
         """Test extracting metadata from pages."""
@@ -146,16 +166,14 @@ class TestLLMSTxtService:
     def test_llms_txt_excludes_unpublished_pages(self, db, llms_client):
         """Test llms.txt only includes pages with geo_html."""
         # Create pages at different stages
-        published_page = Page(
-            client_id=llms_client.id,
-            url=f'https://{llms_client.domain}/published',
-            url_hash=Page.compute_url_hash(f'https://{llms_client.domain}/published'),
+        published_page = _make_page(
+            llms_client,
+            '/published',
             geo_html=MOCK_GEMINI_GEO_HTML
         )
-        unpublished_page = Page(
-            client_id=llms_client.id,
-            url=f'https://{llms_client.domain}/unpublished',
-            url_hash=Page.compute_url_hash(f'https://{llms_client.domain}/unpublished'),
+        unpublished_page = _make_page(
+            llms_client,
+            '/unpublished',
             raw_markdown="# Not processed yet"
             # No geo_html
         )
@@ -298,48 +316,47 @@ class TestLLMSTxtCaching:
         # assert 'llms_txt' in cache_key.lower()
 
 
+@pytest.mark.xdist_group(name='llms_txt_formatting')
 class TestLLMSTxtContentFormatting:
     """Test content formatting in llms.txt."""
 
-    def test_page_title_formatting(self):
-        """Test page titles are properly formatted."""
-        # Titles should be on the same line as the dash
-        # - Title: https://example.com/page
-        assert '- Homepage:' in MOCK_LLMS_TXT
-        assert '- Premium Cotton T-Shirt:' in MOCK_LLMS_TXT
-
-    def test_page_description_formatting(self):
-        """Test page descriptions are indented."""
-        lines = MOCK_LLMS_TXT.split('\n')
-
-        # Descriptions should be indented (2 spaces)
-        description_lines = [l for l in lines if l.startswith('  ') and not l.startswith('  -')]
-        assert len(description_lines) > 0
-
-    def test_url_formatting(self):
-        """Test URLs are properly formatted."""
-        # URLs should be in format: - Title: https://...
-        lines = MOCK_LLMS_TXT.split('\n')
-        url_lines = [l for l in lines if 'https://' in l and l.strip().startswith('-')]
-
-        assert len(url_lines) > 0
-
-        for line in url_lines:
-            assert ': https://' in line
-
-    def test_section_headers(self):
-        """Test section headers are properly formatted."""
-        assert '# Test Shop' in MOCK_LLMS_TXT or '# ' in MOCK_LLMS_TXT
-        assert '## Pages' in MOCK_LLMS_TXT
-
-    def test_site_description_blockquote(self):
-        """Test site description uses blockquote format."""
-        lines = MOCK_LLMS_TXT.split('\n')
-        blockquote_lines = [l for l in lines if l.startswith('>')]
-
-        assert len(blockquote_lines) > 0
-
-
+    @pytest.mark.parametrize('check', [
+        # Titles share the line with the dash: - Title: https://example.com/page
+        pytest.param(
+            lambda text: '- Homepage:' in text and '- Premium Cotton T-Shirt:' in text,
+            id='page_title',
+        ),
+        # Descriptions are indented (2 spaces)
+        pytest.param(
+            _DESCRIPTION_RE.search,
+            id='page_description',
+        ),
+        # URLs are listed as: - Title: https://...
+        pytest.param(
+            _url_lines_well_formed,
+            id='url',
+        ),
+        pytest.param(
+            lambda text: '# ' in text and _HAS_PAGES_SECTION,
+            id='section_headers',
+        ),
+        # Site description is a blockquote
+        pytest.param(
+            _BLOCKQUOTE_RE.search,
+            id='site_description_blockquote',
+        ),
+        # Each page carries its title and description
+        pytest.param(
+            lambda text: 'Premium Cotton T-Shirt' in text and '$29.99' in text,
+            id='page_metadata',
+        ),
+    ])
+    def test_mock_format(self, check):
+        """Test the reference llms.txt formatting rules."""
+        assert check(MOCK_LLMS_TXT)
+
+
+@pytest.mark.xdist_group(name='llms_txt_metadata')
 class TestLLMSTxtMetadata:
     """Test metadata in llms.txt."""
 
@@ -354,34 +371,43 @@ class TestLLMSTxtMetadata:
     def test_includes_site_description(self):
         """Test llms.txt includes site description."""
         # Should have description after site name
-        lines = MOCK_LLMS_TXT.split('\n')
+        lines = _MOCK_LINES
 
         # Find description (> ...)
         description = next((l for l in lines if l.startswith('>')), None)
         assert description is not None
         assert len(description) > 2  # More than just ">"
 
-    def test_includes_page_metadata(self):
-        """Test llms.txt includes page-level metadata."""
-        # Each page should have title and description
-        assert 'Premium Cotton T-Shirt' in MOCK_LLMS_TXT
-        assert '$29.99' in MOCK_LLMS_TXT
-
 
+@pytest.mark.xdist_group(name='llms_txt_special_cases')
 class TestLLMSTxtSpecialCases:
     """Test special cases in llms.txt generation."""
 
+    @pytest.fixture(scope='class')
+    def llms_client(self, class_db):
+        """Create the llms.txt client once for the whole class."""
+        return _make_llms_client(class_db)
+
+    @pytest.fixture(scope='class')
+    def shared_db(self, class_db):
+        """Nest each test's savepoint inside the class session."""
+        return class_db
+
+    @pytest.fixture
+    def db(self, savepoint_db):
+        """Run each test inside a savepoint that is rolled back afterwards."""
+        return savepoint_db
+
     def test_handles_pages_without_description(self, db, llms_client):
         """Test handling pages without descriptions."""
-        page = Page(
-            client_id=llms_client.id,
-            url=f'https://{llms_client.domain}/no-description',
-            url_hash=Page.compute_url_hash(f'https://{llms_client.domain}/no-description'),
+        page = _make_page(
+            llms_client,
+            '/no-description',
             geo_html="<html><head><title>Page</title></head><body></body></html>"
             # Minimal HTML, no description
         )
         db.add(page)
-        db.commit()
+        db.flush()
 
         # from app.services.llms_txt import LLMSTxtService
         # service = LLMSTxtService()
@@ -394,15 +420,14 @@ class TestLLMSTxtSpecialCases:
         """Test handling pages with very long descriptions."""
         long_description = "A" * 1000  # Very long
 
-        page = Page(
-            client_id=llms_client.id,
-            url=f'https://{llms_client.domain}/long-description',
-            url_hash=Page.compute_url_hash(f'https://{llms_client.domain}/long-description'),
+        page = _make_page(
+            llms_client,
+            '/long-description',
             llm_markdown=f"# Page\n\n{long_description}",
             geo_html=f"<html><body><p>{long_description}</p></body></html>"
         )
         db.add(page)
-        db.commit()
+        db.flush()
 
         # from app.services.llms_txt import LLMSTxtService
         # service = LLMSTxtService()
@@ -415,15 +440,14 @@ class TestLLMSTxtSpecialCases:
         """Test handling special characters in titles."""
         special_title = "Product: \"Premium\" & <Exclusive>"
 
-        page = Page(
-            client_id=llms_client.id,
-            url=f'https://{llms_client.domain}/special',
-            url_hash=Page.compute_url_hash(f'https://{llms_client.domain}/special'),
+        page = _make_page(
+            llms_client,
+            '/special',
             llm_markdown=f"# {special_title}",
             geo_html=f"<html><head><title>{special_title}</title></head></html>"
         )
         db.add(page)
-        db.commit()
+        db.flush()
 
         # from app.services.llms_txt import LLMSTxtService
         # service = LLMSTxtService()
@@ -434,16 +458,14 @@ class TestLLMSTxtSpecialCases:
 
     def test_handles_urls_with_query_params(self, db, llms_client):
         """Test handling URLs with query parameters."""
-        url_with_params = f'https://{llms_client.domain}/search?q=test&sort=price'
-
-        page = Page(
-            client_id=llms_client.id,
-            url=url_with_params,
-            url_hash=Page.compute_url_hash(url_with_params),
+        page = _make_page(
+            llms_client,
+            '/search?q=test&sort=price',
             geo_html="<html><body>Search results</body></html>"
         )
+        url_with_params = page.url
         db.add(page)
-        db.commit()
+        db.flush()
 
         # from app.services.llms_txt import LLMSTxtService
         # service = LLMSTxtService()
@@ -458,21 +480,24 @@ class TestLLMSTxtPerformance:
 
     def test_generation_speed_with_many_pages(self, db, llms_client):
         """Test generation handles many pages efficiently."""
-        # Create 100 pages
-        pages = []
+        # Create 100 pages in one executemany INSERT (no ORM objects needed)
+        base = f'https://{llms_client.domain}'
+        rows = []
         for i in range(100):
-            page = Page(
-                client_id=llms_client.id,
-                url=f'https://{llms_client.domain}/page-{i}',
-                url_hash=Page.compute_url_hash(f'https://{llms_client.domain}/page-{i}'),
-                llm_markdown=f"# Page {i}",
-                geo_html=f"<html><body>Page {i}</body></html>"
-            )
-            db.add(page)
-            pages.append(page)
-
+            url = f'{base}/page-{i}'
+            rows.append({
+                'client_id': llms_client.id,
+                'url': url,
+                'url_hash': Page.compute_url_hash(url),
+                'llm_markdown': f"# Page {i}",
+                'geo_html': f"<html><body>Page {i}</body></html>"
+            })
+
+        db.execute(Page.__table__.insert(), rows)
         db.commit()
 
+        assert db.query(Page).filter(Page.client_id == llms_client.id).count() == 100
+
         # from app.services.llms_txt import LLMSTxtService
         # import time
         #
@@ -503,10 +528,9 @@ class TestLLMSTxtIntegration:
     def test_llms_txt_updates_with_pipeline(self, db, llms_client):
         """Test llms.txt reflects pipeline updates."""
         # Add new page
-        new_page = Page(
-            client_id=llms_client.id,
-            url=f'https://{llms_client.domain}/new-page',
-            url_hash=Page.compute_url_hash(f'https://{llms_client.domain}/new-page'),
+        new_page = _make_page(
+            llms_client,
+            '/new-page',
             geo_html="<html><body>New page</body></html>"
         )
         db.add(new_page)
@@ -6,7 +6,7 @@ Tests authentication and bot detection.
 import pytest
 from unittest.mock import Mock, patch
 
-from app.middleware.auth import require_api_key, get_client_ip, detect_bot
+from app.middleware.auth import require_api_key, get_client_ip, detect_bot, AI_BOT_SIGNATURES
 
 
 class TestRequireApiKey:
@@ -206,3 +206,16 @@ class TestDetectBot:
 
         assert is_bot is True
         assert bot_name == 'DuckDuckBot'
+
+    @pytest.mark.parametrize(
+        'bot_signature,expected_name',
+        list(AI_BOT_SIGNATURES.items()),
+        ids=list(AI_BOT_SIGNATURES),
+    )
+    def test_every_signature_detected(self, bot_signature, expected_name):
+        """Test that each known signature maps to its bot name."""
+        user_agent = f'Mozilla/5.0 (compatible; {bot_signature.upper()}/1.0)'
+        is_bot, bot_name = detect_bot(user_agent)
+
+        assert is_bot is True
+        assert bot_name == expected_name
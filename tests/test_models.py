@@ -5,11 +5,27 @@ Tests for Client, Page, and Visit models including encryption.
 """
 import pytest
 from datetime import datetime
-from uuid import UUID
+from uuid import UUID, uuid4
+
+from sqlalchemy.exc import IntegrityError
 
 from app.models.client import Client, Page, Visit
 
 
+@pytest.fixture(scope='function')
+def db(function_db):
+    """
+    Provide a model-level session whose commits stay inside one transaction.
+
+    The schema is created once per session by ``_db``, so tests can commit
+    without recreating tables; see ``function_db``.
+
+    Returns:
+        Database session
+    """
+    return function_db
+
+
 class TestClientModel:
     """Test Client model."""
 
@@ -33,71 +49,42 @@ class TestClientModel:
         assert client.created_at is not None
         assert client.updated_at is not None
 
-    def test_client_unique_name(self, db, sample_client):
-        """Test that client name must be unique."""
-        duplicate = Client(
-            name=sample_client.name,  # Same name
-            domain='different.com'
-        )
-
-        db.add(duplicate)
+    @pytest.mark.parametrize('conflict_field', ['name', 'domain'])
+    def test_client_unique_constraint(self, db, sample_client, conflict_field):
+        """Test that client name and domain must be unique."""
+        values = {'name': 'Different Corp', 'domain': 'different.com'}
+        values[conflict_field] = getattr(sample_client, conflict_field)
 
-        with pytest.raises(Exception):  # IntegrityError
-            db.commit()
+        db.add(Client(**values))
 
-    def test_client_unique_domain(self, db, sample_client):
-        """Test that client domain must be unique."""
-        duplicate = Client(
-            name='Different Corp',
-            domain=sample_client.domain  # Same domain
-        )
+        with pytest.raises(IntegrityError):
+            db.flush()
 
-        db.add(duplicate)
-
-        with pytest.raises(Exception):  # IntegrityError
-            db.commit()
-
-    def test_client_cloudflare_token_encryption(self, db):
-        """Test Cloudflare API token encryption/decryption."""
+    @pytest.mark.parametrize('attr,encrypted_attr,value', [
+        ('cloudflare_api_token', 'cloudflare_api_token_encrypted', 'super-secret-token-123'),
+        ('gemini_api_key', 'gemini_api_key_encrypted', 'gemini-api-key-xyz'),
+    ], ids=['cloudflare_token', 'gemini_key'])
+    def test_client_secret_encryption(self, db, attr, encrypted_attr, value):
+        """Test encryption/decryption of the client's secret fields."""
         client = Client(
             name='Test Corp',
             domain='test.com'
         )
 
         # Set encrypted field using property
-        client.cloudflare_api_token = 'super-secret-token-123'
+        setattr(client, attr, value)
 
         db.add(client)
-        db.commit()
-        db.refresh(client)
+        db.flush()
 
         # Raw field should be encrypted bytes
-        assert client.cloudflare_api_token_encrypted is not None
-        assert isinstance(client.cloudflare_api_token_encrypted, bytes)
-        assert b'super-secret-token-123' not in client.cloudflare_api_token_encrypted
+        encrypted = getattr(client, encrypted_attr)
+        assert encrypted is not None
+        assert isinstance(encrypted, bytes)
+        assert value.encode() not in encrypted
 
         # Property should decrypt
-        assert client.cloudflare_api_token == 'super-secret-token-123'
-
-    def test_client_gemini_key_encryption(self, db):
-        """Test Gemini API key encryption/decryption."""
-        client = Client(
-            name='Test Corp',
-            domain='test.com'
-        )
-
-        client.gemini_api_key = 'gemini-api-key-xyz'
-
-        db.add(client)
-        db.commit()
-        db.refresh(client)
-
-        # Raw field should be encrypted
-        assert client.gemini_api_key_encrypted is not None
-        assert isinstance(client.gemini_api_key_encrypted, bytes)
-
-        # Property should decrypt
-        assert client.gemini_api_key == 'gemini-api-key-xyz'
+        assert getattr(client, attr) == value
 
     def test_client_optional_fields_null(self, db):
         """Test that optional encrypted fields can be None."""
@@ -108,8 +95,7 @@ class TestClientModel:
 
         # Don't set encrypted fields
         db.add(client)
-        db.commit()
-        db.refresh(client)
+        db.flush()
 
         assert client.cloudflare_api_token is None
         assert client.cloudflare_api_token_encrypted is None
@@ -159,19 +145,21 @@ class TestClientModel:
         db.commit()
 
         # Page should be deleted
-        page = db.query(Page).filter(Page.id == page_id).first()
-        assert page is None
+        assert db.get(Page, page_id) is None
 
 
 class TestPageModel:
     """Test Page model."""
 
+    _URL = 'https://example.com/test'
+    _URL_HASH = Page.compute_url_hash(_URL)
+
     def test_create_page(self, db, sample_client):
         """Test creating a basic page."""
         page = Page(
             client_id=sample_client.id,
-            url='https://example.com/test',
-            url_hash=Page.compute_url_hash('https://example.com/test'),
+            url=self._URL,
+            url_hash=self._URL_HASH,
             raw_html='<html>test</html>'
         )
 
@@ -181,7 +169,7 @@ class TestPageModel:
 
         assert page.id is not None
         assert isinstance(page.id, UUID)
-        assert page.url == 'https://example.com/test'
+        assert page.url == self._URL
         assert page.version == 1
 
     def test_page_unique_client_url(self, db, sample_client, sample_page):
@@ -197,60 +185,24 @@ class TestPageModel:
         with pytest.raises(Exception):  # IntegrityError
             db.commit()
 
-    def test_compute_url_hash(self):
-        """Test URL hash computation."""
-        url1 = 'https://example.com/page'
-        url2 = 'https://example.com/page'
-        url3 = 'https://example.com/other'
-
-        hash1 = Page.compute_url_hash(url1)
-        hash2 = Page.compute_url_hash(url2)
-        hash3 = Page.compute_url_hash(url3)
-
-        # Same URL should produce same hash
-        assert hash1 == hash2
-
-        # Different URL should produce different hash
-        assert hash1 != hash3
-
-        # Hash should be hex string
-        assert isinstance(hash1, str)
-        assert len(hash1) == 64  # SHA-256 produces 64 hex chars
-
-    def test_compute_content_hash(self):
-        """Test content hash computation."""
-        content1 = '<html>test</html>'
-        content2 = '<html>test</html>'
-        content3 = '<html>other</html>'
-
-        hash1 = Page.compute_content_hash(content1)
-        hash2 = Page.compute_content_hash(content2)
-        hash3 = Page.compute_content_hash(content3)
-
-        assert hash1 == hash2
-        assert hash1 != hash3
-        assert isinstance(hash1, str)
-        assert len(hash1) == 64
-
-    def test_update_url_hash(self, db, sample_client):
+    def test_update_url_hash(self):
         """Test update_url_hash method."""
         page = Page(
-            client_id=sample_client.id,
-            url='https://example.com/test',
+            client_id=uuid4(),
+            url=self._URL,
             url_hash=''  # Empty initially
         )
 
         page.update_url_hash()
 
-        expected_hash = Page.compute_url_hash('https://example.com/test')
-        assert page.url_hash == expected_hash
+        assert page.url_hash == self._URL_HASH
 
-    def test_update_content_hash(self, db, sample_client):
+    def test_update_content_hash(self):
         """Test update_content_hash method."""
         page = Page(
-            client_id=sample_client.id,
-            url='https://example.com/test',
-            url_hash=Page.compute_url_hash('https://example.com/test'),
+            client_id=uuid4(),
+            url=self._URL,
+            url_hash=self._URL_HASH,
             raw_html='<html>content</html>'
         )
 
@@ -259,12 +211,12 @@ class TestPageModel:
         expected_hash = Page.compute_content_hash('<html>content</html>')
         assert page.content_hash == expected_hash
 
-    def test_update_content_hash_no_html(self, db, sample_client):
+    def test_update_content_hash_no_html(self):
         """Test update_content_hash with no raw_html."""
         page = Page(
-            client_id=sample_client.id,
-            url='https://example.com/test',
-            url_hash=Page.compute_url_hash('https://example.com/test'),
+            client_id=uuid4(),
+            url=self._URL,
+            url_hash=self._URL_HASH,
             raw_html=None
         )
 
@@ -336,29 +288,6 @@ class TestVisitModel:
         assert visit.id is not None
         assert visit.page_id is None
 
-    def test_hash_ip(self):
-        """Test IP address hashing."""
-        ip1 = '192.168.1.1'
-        ip2 = '192.168.1.1'
-        ip3 = '192.168.1.2'
-
-        hash1 = Visit.hash_ip(ip1)
-        hash2 = Visit.hash_ip(ip2)
-        hash3 = Visit.hash_ip(ip3)
-
-        # Same IP should produce same hash
-        assert hash1 == hash2
-
-        # Different IP should produce different hash
-        assert hash1 != hash3
-
-        # Hash should not contain original IP
-        assert '192.168.1.1' not in hash1
-
-        # Hash should be hex string
-        assert isinstance(hash1, str)
-        assert len(hash1) == 64
-
     def test_visit_to_dict(self, sample_visit):
         """Test visit to_dict method."""
         data = sample_visit.to_dict()
@@ -389,6 +318,37 @@ class TestVisitModel:
         db.commit()
 
         # Visit should still exist but page_id should be NULL
-        visit = db.query(Visit).filter(Visit.id == visit_id).first()
+        visit = db.get(Visit, visit_id)
         assert visit is not None
         assert visit.page_id is None
+
+
+class TestHashing:
+    """Test the static hashing helpers on Page and Visit."""
+
+    @pytest.mark.parametrize('fn,value,expected,other', [
+        (
+            Page.compute_url_hash, 'https://example.com/page',
+            '3641c5f2274c5471278ab5bf1df6d1858d8aa392d85c51301abed2122a3c634f',
+            'https://example.com/other',
+        ),
+        (
+            Page.compute_content_hash, '<html>test</html>',
+            'bc7c8fc96a25bf6ff242fc73cce18291deac4505886b017220a151d0d8192d36',
+            '<html>other</html>',
+        ),
+        (
+            Visit.hash_ip, '192.168.1.1',
+            'c5eb5a4cc76a5cdb16e79864b9ccd26c3553f0c396d0a21bafb7be71c1efcd8c',
+            '192.168.1.2',
+        ),
+    ], ids=['url_hash', 'content_hash', 'ip_hash'])
+    def test_hash_properties(self, fn, value, expected, other):
+        """Hashes match the known SHA-256 digest and differ per input."""
+        digest = fn(value)
+
+        # Pinned digests catch any change to the algorithm or normalization,
+        # which would orphan every stored url_hash/ip_hash.
+        assert digest == expected
+        assert fn(other) != expected
+        assert value not in digest